@@ -21,8 +21,9 @@ import fnmatch
 import os
 import subprocess
 
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, Generator, List, Union
+from typing import Any, Dict, Generator, List, Optional, Tuple, Union
 
 import toml
 
@@ -104,21 +105,47 @@ class FileSelector:
                 selected_files = self.editor_file_selector(self.project_path, True)
 
         content_dict = {}
-        for file_path in selected_files:
-            # selected files contains paths that are relative to the project path
-            try:
-                # to open the file we need the path from the cwd
-                with open(
-                    Path(self.project_path) / file_path, "r", encoding="utf-8"
-                ) as content:
-                    content_dict[str(file_path)] = content.read()
-            except FileNotFoundError:
-                print(f"Warning: File not found {file_path}")
-            except UnicodeDecodeError:
-                print(f"Warning: File not UTF-8 encoded {file_path}, skipping")
+        if selected_files:
+            # read the selected files concurrently, the reads are I/O bound
+            with ThreadPoolExecutor(
+                max_workers=min(32, len(selected_files))
+            ) as executor:
+                results = executor.map(self.read_selected_file, selected_files)
+                for file_path, (content, warning) in zip(selected_files, results):
+                    if warning:
+                        print(warning)
+                    else:
+                        content_dict[str(file_path)] = content
 
         return FilesDict(content_dict), self.is_linting
 
+    def read_selected_file(
+        self, file_path: Union[str, Path]
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Reads a selected file relative to the project path.
+
+        Parameters
+        ----------
+        file_path : Union[str, Path]
+            The path of the selected file, relative to the project path.
+
+        Returns
+        -------
+        Tuple[Optional[str], Optional[str]]
+            The file content and None, or None and a warning if the file could not be read.
+        """
+        try:
+            # to open the file we need the path from the cwd
+            with open(
+                Path(self.project_path) / file_path, "r", encoding="utf-8"
+            ) as content:
+                return content.read(), None
+        except FileNotFoundError:
+            return None, f"Warning: File not found {file_path}"
+        except UnicodeDecodeError:
+            return None, f"Warning: File not UTF-8 encoded {file_path}, skipping"
+
     def editor_file_selector(
         self, input_path: Union[str, Path], init: bool = True
     ) -> List[str]:
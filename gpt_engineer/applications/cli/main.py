@@ -25,66 +25,107 @@ Notes
 - When using the `azure_endpoint` parameter, provide the Azure OpenAI service endpoint URL.
 """
 
+import argparse
 import difflib
 import logging
 import os
+import shutil
 import sys
 
 from pathlib import Path
+from typing import Iterator, List, Optional
 
-import openai
-import typer
+try:
+    from cdifflib import CSequenceMatcher
+except ImportError:
+    CSequenceMatcher = None
 
-from dotenv import load_dotenv
-from langchain.globals import set_llm_cache
-from langchain_community.cache import SQLiteCache
-from termcolor import colored
-
-from gpt_engineer.applications.cli.cli_agent import CliAgent
-from gpt_engineer.applications.cli.collect import collect_and_send_human_review
 from gpt_engineer.applications.cli.file_selector import FileSelector
-from gpt_engineer.core.ai import AI, ClipboardAI
-from gpt_engineer.core.default.disk_execution_env import DiskExecutionEnv
 from gpt_engineer.core.default.disk_memory import DiskMemory
-from gpt_engineer.core.default.file_store import FileStore
 from gpt_engineer.core.default.paths import PREPROMPTS_PATH, memory_path
-from gpt_engineer.core.default.steps import (
-    execute_entrypoint,
-    gen_code,
-    handle_improve_mode,
-    improve_fn as improve_fn,
-)
 from gpt_engineer.core.files_dict import FilesDict
 from gpt_engineer.core.git import stage_uncommitted_to_git
 from gpt_engineer.core.preprompts_holder import PrepromptsHolder
 from gpt_engineer.core.prompt import Prompt
-from gpt_engineer.tools.custom_steps import clarified_gen, lite_gen, self_heal
 
-app = typer.Typer(
-    context_settings={"help_option_names": ["-h", "--help"]}
-)  # creates a CLI app
+# The LLM stack (openai, langchain and the modules built on them) is imported inside
+# the functions that need it, so that `--help` and argument errors return quickly.
+
+# ANSI escape sequences for terminal colors
+RED = "\033[38;5;202m"
+GREEN = "\033[92m"
+RESET = "\033[0m"
+TERM_GREEN = "\033[32m"
+TERM_RED = "\033[31m"
+
+
+def use_term_colors() -> bool:
+    """
+    Check whether the prompts should be colored, following termcolor's rules.
+
+    Colors are disabled by ANSI_COLORS_DISABLED or NO_COLOR, forced by FORCE_COLOR,
+    and otherwise only used when stdout is a terminal that is not dumb.
+    """
+    if "ANSI_COLORS_DISABLED" in os.environ or "NO_COLOR" in os.environ:
+        return False
+    if "FORCE_COLOR" in os.environ:
+        return True
+    return (
+        hasattr(sys.stdout, "isatty")
+        and sys.stdout.isatty()
+        and os.environ.get("TERM") != "dumb"
+    )
+
+
+def term_colored(text: str, color: str, enabled: bool) -> str:
+    return f"{color}{text}{RESET}" if enabled else text
+
+
+# the prompts are colored once at startup instead of checking on every call
+_USE_TERM_COLORS = use_term_colors()
+TERM_CHOICES = (
+    term_colored("y", TERM_GREEN, _USE_TERM_COLORS)
+    + "/"
+    + term_colored("n", TERM_RED, _USE_TERM_COLORS)
+    + " "
+)
+PROMPT_FILE_NOTICE = term_colored(
+    "Using prompt from file:", TERM_GREEN, _USE_TERM_COLORS
+)
+APPLY_CHANGES_QUESTION = term_colored(
+    "Do you want to apply these changes?", GREEN, _USE_TERM_COLORS
+)
+
+
+_ENV_LOADED = False
 
 
 def load_env_if_needed():
     """
-    Load environment variables if the OPENAI_API_KEY is not already set.
+    Load environment variables if the API keys are not already set.
 
-    This function checks if the OPENAI_API_KEY environment variable is set,
-    and if not, it attempts to load it from a .env file in the current working
-    directory. It then sets the openai.api_key for use in the application.
+    This function checks if the OPENAI_API_KEY and ANTHROPIC_API_KEY environment
+    variables are set, and if not, it attempts to load them from a .env file in the
+    current working directory. The .env files are read at most once per process.
+    It then sets the openai.api_key for use in the application.
     """
-    # We have all these checks for legacy reasons...
-    if os.getenv("OPENAI_API_KEY") is None:
-        load_dotenv()
-    if os.getenv("OPENAI_API_KEY") is None:
-        load_dotenv(dotenv_path=os.path.join(os.getcwd(), ".env"))
+    global _ENV_LOADED
 
-    openai.api_key = os.getenv("OPENAI_API_KEY")
+    import openai
+
+    from dotenv import load_dotenv
 
-    if os.getenv("ANTHROPIC_API_KEY") is None:
-        load_dotenv()
-    if os.getenv("ANTHROPIC_API_KEY") is None:
-        load_dotenv(dotenv_path=os.path.join(os.getcwd(), ".env"))
+    if not _ENV_LOADED:
+        # We have all these checks for legacy reasons...
+        if (
+            os.getenv("OPENAI_API_KEY") is None
+            or os.getenv("ANTHROPIC_API_KEY") is None
+        ):
+            load_dotenv()
+            load_dotenv(dotenv_path=os.path.join(os.getcwd(), ".env"))
+        _ENV_LOADED = True
+
+    openai.api_key = os.getenv("OPENAI_API_KEY")
 
 
 def concatenate_paths(base_path, sub_path):
@@ -128,7 +169,7 @@ def load_prompt(
         )
     prompt_str = input_repo.get(prompt_file)
     if prompt_str:
-        print(colored("Using prompt from file:", "green"), prompt_file)
+        print(PROMPT_FILE_NOTICE, prompt_file)
         print(prompt_str)
     else:
         if not improve_mode:
@@ -188,149 +229,122 @@ def get_preprompts_path(use_custom_preprompts: bool, input_path: Path) -> Path:
         return original_preprompts_path
 
     custom_preprompts_path = input_path / "preprompts"
-    if not custom_preprompts_path.exists():
-        custom_preprompts_path.mkdir()
+    custom_preprompts_path.mkdir(exist_ok=True)
 
-    for file in original_preprompts_path.glob("*"):
-        if not (custom_preprompts_path / file.name).exists():
-            (custom_preprompts_path / file.name).write_text(file.read_text())
+    existing = {entry.name for entry in os.scandir(custom_preprompts_path)}
+    for entry in os.scandir(original_preprompts_path):
+        if entry.name not in existing:
+            shutil.copyfile(entry.path, custom_preprompts_path / entry.name)
     return custom_preprompts_path
 
 
-def compare(f1: FilesDict, f2: FilesDict):
-    def colored_diff(s1, s2):
-        lines1 = s1.splitlines()
-        lines2 = s2.splitlines()
+def _format_range_unified(start: int, stop: int) -> str:
+    # unified diff ranges are 1-based, an empty range starts at the line before it
+    beginning = start + 1
+    length = stop - start
+    if length == 1:
+        return f"{beginning}"
+    if not length:
+        beginning -= 1
+    return f"{beginning},{length}"
+
+
+def _unified_diff(matcher, lines1: List[str], lines2: List[str]) -> Iterator[str]:
+    # difflib.unified_diff always uses difflib's pure-Python SequenceMatcher,
+    # this produces the same lines from the opcodes of any matcher
+    for index, group in enumerate(matcher.get_grouped_opcodes(3)):
+        if index == 0:
+            yield "--- "
+            yield "+++ "
+
+        first, last = group[0], group[-1]
+        range1 = _format_range_unified(first[1], last[2])
+        range2 = _format_range_unified(first[3], last[4])
+        yield f"@@ -{range1} +{range2} @@"
+
+        for tag, i1, i2, j1, j2 in group:
+            if tag == "equal":
+                for line in lines1[i1:i2]:
+                    yield " " + line
+                continue
+            if tag in ("replace", "delete"):
+                for line in lines1[i1:i2]:
+                    yield "-" + line
+            if tag in ("replace", "insert"):
+                for line in lines2[j1:j2]:
+                    yield "+" + line
+
+
+def colored_diff(s1: str, s2: str) -> Iterator[str]:
+    """
+    Yield the lines of a unified diff between two strings, colored for the terminal.
 
+    Added lines are colored green and removed lines red. The lines are matched with
+    cdifflib's C implementation of SequenceMatcher when it is installed.
+    """
+    lines1 = s1.splitlines()
+    lines2 = s2.splitlines()
+    if CSequenceMatcher is None:
         diff = difflib.unified_diff(lines1, lines2, lineterm="")
+    else:
+        diff = _unified_diff(CSequenceMatcher(None, lines1, lines2), lines1, lines2)
 
-        RED = "\033[38;5;202m"
-        GREEN = "\033[92m"
-        RESET = "\033[0m"
-
-        colored_lines = []
-        for line in diff:
-            if line.startswith("+"):
-                colored_lines.append(GREEN + line + RESET)
-            elif line.startswith("-"):
-                colored_lines.append(RED + line + RESET)
-            else:
-                colored_lines.append(line)
+    for line in diff:
+        if line[:1] == "+":
+            yield GREEN + line + RESET
+        elif line[:1] == "-":
+            yield RED + line + RESET
+        else:
+            yield line
 
-        return "\n".join(colored_lines)
 
-    for file in sorted(set(f1) | set(f2)):
-        diff = colored_diff(f1.get(file, ""), f2.get(file, ""))
+def compare(f1: FilesDict, f2: FilesDict):
+    # collect the whole report and write it to stdout at once
+    buffer = []
+    f1_get, f2_get = f1.get, f2.get
+    for file in sorted(f1.keys() | f2.keys()):
+        before, after = f1_get(file, ""), f2_get(file, "")
+        if before == after:
+            continue
+        diff = "\n".join(colored_diff(before, after))
+        # contents that differ only in line endings produce no diff lines
         if diff:
-            print(f"Changes to {file}:")
-            print(diff)
+            buffer.append(f"Changes to {file}:\n{diff}\n")
+    sys.stdout.write("".join(buffer))
+
+
+YES_ANSWERS = frozenset(("y", "yes"))
+NO_ANSWERS = frozenset(("n", "no"))
 
 
 def prompt_yesno() -> bool:
-    TERM_CHOICES = colored("y", "green") + "/" + colored("n", "red") + " "
     while True:
         response = input(TERM_CHOICES).strip().lower()
-        if response in ["y", "yes"]:
+        if response in YES_ANSWERS:
             return True
-        if response in ["n", "no"]:
-            break
+        if response in NO_ANSWERS:
+            return False
         print("Please respond with 'y' or 'n'")
 
 
-@app.command(
-    help="""
-        GPT-engineer lets you:
-
-        \b
-        - Specify a software in natural language
-        - Sit back and watch as an AI writes and executes the code
-        - Ask the AI to implement improvements
-    """
-)
 def main(
-    project_path: str = typer.Argument(".", help="path"),
-    model: str = typer.Option(
-        os.environ.get("MODEL_NAME", "gpt-4o"), "--model", "-m", help="model id string"
-    ),
-    temperature: float = typer.Option(
-        0.1,
-        "--temperature",
-        "-t",
-        help="Controls randomness: lower values for more focused, deterministic outputs",
-    ),
-    improve_mode: bool = typer.Option(
-        False,
-        "--improve",
-        "-i",
-        help="Improve an existing project by modifying the files.",
-    ),
-    lite_mode: bool = typer.Option(
-        False,
-        "--lite",
-        "-l",
-        help="Lite mode: run a generation using only the main prompt.",
-    ),
-    clarify_mode: bool = typer.Option(
-        False,
-        "--clarify",
-        "-c",
-        help="Clarify mode - discuss specification with AI before implementation.",
-    ),
-    self_heal_mode: bool = typer.Option(
-        False,
-        "--self-heal",
-        "-sh",
-        help="Self-heal mode - fix the code by itself when it fails.",
-    ),
-    azure_endpoint: str = typer.Option(
-        "",
-        "--azure",
-        "-a",
-        help="""Endpoint for your Azure OpenAI Service (https://xx.openai.azure.com).
-            In that case, the given model is the deployment name chosen in the Azure AI Studio.""",
-    ),
-    use_custom_preprompts: bool = typer.Option(
-        False,
-        "--use-custom-preprompts",
-        help="""Use your project's custom preprompts instead of the default ones.
-          Copies all original preprompts to the project's workspace if they don't exist there.""",
-    ),
-    llm_via_clipboard: bool = typer.Option(
-        False,
-        "--llm-via-clipboard",
-        help="Use the clipboard to communicate with the AI.",
-    ),
-    verbose: bool = typer.Option(
-        False, "--verbose", "-v", help="Enable verbose logging for debugging."
-    ),
-    debug: bool = typer.Option(
-        False, "--debug", "-d", help="Enable debug mode for debugging."
-    ),
-    prompt_file: str = typer.Option(
-        "prompt",
-        "--prompt_file",
-        help="Relative path to a text file containing a prompt.",
-    ),
-    entrypoint_prompt_file: str = typer.Option(
-        "",
-        "--entrypoint_prompt",
-        help="Relative path to a text file containing a file that specifies requirements for you entrypoint.",
-    ),
-    image_directory: str = typer.Option(
-        "",
-        "--image_directory",
-        help="Relative path to a folder containing images.",
-    ),
-    use_cache: bool = typer.Option(
-        False,
-        "--use_cache",
-        help="Speeds up computations and saves tokens when running the same prompt multiple times by caching the LLM response.",
-    ),
-    no_execution: bool = typer.Option(
-        False,
-        "--no_execution",
-        help="Run setup but to not call LLM or write any code. For testing purposes.",
-    ),
+    project_path: str = ".",
+    model: str = os.environ.get("MODEL_NAME", "gpt-4o"),
+    temperature: float = 0.1,
+    improve_mode: bool = False,
+    lite_mode: bool = False,
+    clarify_mode: bool = False,
+    self_heal_mode: bool = False,
+    azure_endpoint: str = "",
+    use_custom_preprompts: bool = False,
+    llm_via_clipboard: bool = False,
+    verbose: bool = False,
+    debug: bool = False,
+    prompt_file: str = "prompt",
+    entrypoint_prompt_file: str = "",
+    image_directory: str = "",
+    use_cache: bool = False,
+    no_execution: bool = False,
 ):
     """
     The main entry point for the CLI tool that generates or improves a project.
@@ -384,12 +398,31 @@ def main(
 
     # Validate arguments
     if improve_mode and (clarify_mode or lite_mode):
-        typer.echo("Error: Clarify and lite mode are not compatible with improve mode.")
-        raise typer.Exit(code=1)
+        print(
+            "Error: Clarify and lite mode are not compatible with improve mode.",
+            file=sys.stderr,
+        )
+        raise SystemExit(1)
+
+    from gpt_engineer.applications.cli.cli_agent import CliAgent
+    from gpt_engineer.applications.cli.collect import collect_and_send_human_review
+    from gpt_engineer.core.ai import AI, ClipboardAI
+    from gpt_engineer.core.default.disk_execution_env import DiskExecutionEnv
+    from gpt_engineer.core.default.file_store import FileStore
+    from gpt_engineer.core.default.steps import (
+        execute_entrypoint,
+        gen_code,
+        handle_improve_mode,
+        improve_fn,
+    )
+    from gpt_engineer.tools.custom_steps import clarified_gen, lite_gen, self_heal
 
     # Set up logging
     logging.basicConfig(level=logging.DEBUG if verbose else logging.INFO)
     if use_cache:
+        from langchain.globals import set_llm_cache
+        from langchain_community.cache import SQLiteCache
+
         set_llm_cache(SQLiteCache(database_path=".langchain.db"))
     if improve_mode:
         assert not (
@@ -408,10 +441,11 @@ def main(
         )
 
     path = Path(project_path)
-    print("Running gpt-engineer in", path.absolute(), "\n")
+    input_repo = DiskMemory(path)
+    print("Running gpt-engineer in", input_repo.path, "\n")
 
     prompt = load_prompt(
-        DiskMemory(path),
+        input_repo,
         improve_mode,
         prompt_file,
         image_directory,
@@ -437,10 +471,10 @@ def main(
         execution_fn = execute_entrypoint
 
     preprompts_holder = PrepromptsHolder(
-        get_preprompts_path(use_custom_preprompts, Path(project_path))
+        get_preprompts_path(use_custom_preprompts, path)
     )
 
-    memory = DiskMemory(memory_path(project_path))
+    memory = DiskMemory(memory_path(path))
     memory.archive_logs()
 
     execution_env = DiskExecutionEnv()
@@ -454,10 +488,10 @@ def main(
         preprompts_holder=preprompts_holder,
     )
 
-    files = FileStore(project_path)
+    files = FileStore(path)
     if not no_execution:
         if improve_mode:
-            files_dict_before, is_linting = FileSelector(project_path).ask_for_files()
+            files_dict_before, is_linting = FileSelector(path).ask_for_files()
 
             # lint the code
             if is_linting:
@@ -474,7 +508,7 @@ def main(
                 compare(files_dict_before, files_dict)
 
                 print()
-                print(colored("Do you want to apply these changes?", "light_green"))
+                print(APPLY_CHANGES_QUESTION)
                 if not prompt_yesno():
                     files_dict = files_dict_before
 
@@ -484,16 +518,153 @@ def main(
             config = (code_gen_fn.__name__, execution_fn.__name__)
             collect_and_send_human_review(prompt, model, temperature, config, memory)
 
-        stage_uncommitted_to_git(path, files_dict, improve_mode)
+        # declined improvements overwrite nothing unless the files were linted
+        if not improve_mode or is_linting or files_dict is not files_dict_before:
+            stage_uncommitted_to_git(path, files_dict, improve_mode)
 
         files.push(files_dict)
 
-    if ai.token_usage_log.is_openai_model():
-        print("Total api cost: $ ", ai.token_usage_log.usage_cost())
+    token_usage_log = ai.token_usage_log
+    if token_usage_log.is_openai_model():
+        print("Total api cost: $ ", token_usage_log.usage_cost())
     elif os.getenv("LOCAL_MODEL"):
         print("Total api cost: $ 0.0 since we are using local LLM.")
     else:
-        print("Total tokens used: ", ai.token_usage_log.total_tokens())
+        print("Total tokens used: ", token_usage_log.total_tokens())
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Build the argument parser for the CLI tool.
+
+    The destinations of the arguments match the parameter names of `main`, so the
+    parsed namespace can be passed to it directly.
+
+    Returns
+    -------
+    argparse.ArgumentParser
+        The parser for the `gpt-engineer` command line.
+    """
+    parser = argparse.ArgumentParser(
+        prog="gpt-engineer",
+        description="""GPT-engineer lets you:
+
+  - Specify a software in natural language
+  - Sit back and watch as an AI writes and executes the code
+  - Ask the AI to implement improvements
+""",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("project_path", nargs="?", default=".", help="path")
+    parser.add_argument(
+        "--model",
+        "-m",
+        default=os.environ.get("MODEL_NAME", "gpt-4o"),
+        help="model id string",
+    )
+    parser.add_argument(
+        "--temperature",
+        "-t",
+        type=float,
+        default=0.1,
+        help="Controls randomness: lower values for more focused, deterministic outputs",
+    )
+    parser.add_argument(
+        "--improve",
+        "-i",
+        dest="improve_mode",
+        action="store_true",
+        help="Improve an existing project by modifying the files.",
+    )
+    parser.add_argument(
+        "--lite",
+        "-l",
+        dest="lite_mode",
+        action="store_true",
+        help="Lite mode: run a generation using only the main prompt.",
+    )
+    parser.add_argument(
+        "--clarify",
+        "-c",
+        dest="clarify_mode",
+        action="store_true",
+        help="Clarify mode - discuss specification with AI before implementation.",
+    )
+    parser.add_argument(
+        "--self-heal",
+        "-sh",
+        dest="self_heal_mode",
+        action="store_true",
+        help="Self-heal mode - fix the code by itself when it fails.",
+    )
+    parser.add_argument(
+        "--azure",
+        "-a",
+        dest="azure_endpoint",
+        default="",
+        help="""Endpoint for your Azure OpenAI Service (https://xx.openai.azure.com).
+            In that case, the given model is the deployment name chosen in the Azure AI Studio.""",
+    )
+    parser.add_argument(
+        "--use-custom-preprompts",
+        action="store_true",
+        help="""Use your project's custom preprompts instead of the default ones.
+          Copies all original preprompts to the project's workspace if they don't exist there.""",
+    )
+    parser.add_argument(
+        "--llm-via-clipboard",
+        action="store_true",
+        help="Use the clipboard to communicate with the AI.",
+    )
+    parser.add_argument(
+        "--verbose",
+        "-v",
+        action="store_true",
+        help="Enable verbose logging for debugging.",
+    )
+    parser.add_argument(
+        "--debug", "-d", action="store_true", help="Enable debug mode for debugging."
+    )
+    parser.add_argument(
+        "--prompt_file",
+        default="prompt",
+        help="Relative path to a text file containing a prompt.",
+    )
+    parser.add_argument(
+        "--entrypoint_prompt",
+        dest="entrypoint_prompt_file",
+        default="",
+        help="Relative path to a text file containing a file that specifies requirements for you entrypoint.",
+    )
+    parser.add_argument(
+        "--image_directory",
+        default="",
+        help="Relative path to a folder containing images.",
+    )
+    parser.add_argument(
+        "--use_cache",
+        action="store_true",
+        help="Speeds up computations and saves tokens when running the same prompt multiple times by caching the LLM response.",
+    )
+    parser.add_argument(
+        "--no_execution",
+        action="store_true",
+        help="Run setup but to not call LLM or write any code. For testing purposes.",
+    )
+    return parser
+
+
+def app(argv: Optional[List[str]] = None):
+    """
+    Parse the command line arguments and run `main` with them.
+
+    Parameters
+    ----------
+    argv : list of str, optional
+        The arguments to parse. Defaults to `sys.argv[1:]`.
+    """
+    args = build_parser().parse_args(argv)
+    main(**vars(args))
 
 
 if __name__ == "__main__":
@@ -39,6 +39,7 @@ metadata_path : function
 import os
 
 from pathlib import Path
+from typing import Union
 
 META_DATA_REL_PATH = ".gpteng"
 MEMORY_REL_PATH = os.path.join(META_DATA_REL_PATH, "memory")
@@ -52,13 +53,13 @@ ENTRYPOINT_FILE = "run.sh"
 PREPROMPTS_PATH = Path(__file__).parent.parent.parent / "preprompts"
 
 
-def memory_path(path):
+def memory_path(path: Union[str, Path]) -> str:
     """
     Constructs the full path to the memory directory based on a given base path.
 
     Parameters
     ----------
-    path : str
+    path : str or Path
         The base path to append the memory directory to.
 
     Returns
@@ -69,13 +70,13 @@ def memory_path(path):
     return os.path.join(path, MEMORY_REL_PATH)
 
 
-def metadata_path(path):
+def metadata_path(path: Union[str, Path]) -> str:
     """
     Constructs the full path to the metadata directory based on a given base path.
 
     Parameters
     ----------
-    path : str
+    path : str or Path
         The base path to append the metadata directory to.
 
     Returns
@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Optional, Tuple
 
 from gpt_engineer.core.default.disk_memory import DiskMemory
 
@@ -9,6 +9,8 @@ class PrepromptsHolder:
     A holder for preprompt texts that are stored on disk.
 
     This class provides methods to retrieve preprompt texts from a specified directory.
+    The texts are read once and reused until a file in the directory is added,
+    removed or modified.
 
     Attributes
     ----------
@@ -23,7 +25,19 @@ class PrepromptsHolder:
 
     def __init__(self, preprompts_path: Path):
         self.preprompts_path = preprompts_path
+        self._preprompts: Optional[Dict[str, str]] = None
+        self._signature: Tuple[Tuple[str, int], ...] = ()
 
     def get_preprompts(self) -> Dict[str, str]:
-        preprompts_repo = DiskMemory(self.preprompts_path)
-        return {file_name: preprompts_repo[file_name] for file_name in preprompts_repo}
+        signature = tuple(
+            (str(item), item.stat().st_mtime_ns)
+            for item in sorted(Path(self.preprompts_path).rglob("*"))
+            if item.is_file()
+        )
+        if self._preprompts is None or signature != self._signature:
+            preprompts_repo = DiskMemory(self.preprompts_path)
+            self._preprompts = {
+                file_name: preprompts_repo[file_name] for file_name in preprompts_repo
+            }
+            self._signature = signature
+        return dict(self._preprompts)
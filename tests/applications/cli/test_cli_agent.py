@@ -1,5 +1,4 @@
 import os
-import tempfile
 
 import pytest
 
@@ -17,11 +16,19 @@ from gpt_engineer.tools.custom_steps import clarified_gen, lite_gen
 from tests.mock_ai import MockAI
 
 
-def test_init_standard_config(monkeypatch):
+@pytest.fixture
+def env():
+    return DiskExecutionEnv()
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    return tmp_path, DiskMemory(memory_path(tmp_path))
+
+
+def test_init_standard_config(monkeypatch, workspace, env):
     monkeypatch.setattr("builtins.input", lambda _: "y")
-    temp_dir = tempfile.mkdtemp()
-    memory = DiskMemory(memory_path(temp_dir))
-    execution_env = DiskExecutionEnv()
+    temp_dir, memory = workspace
     mock_ai = MockAI(
         [
             AIMessage(
@@ -30,7 +37,7 @@ def test_init_standard_config(monkeypatch):
             AIMessage("```run.sh\npython3 hello_world.py\n```"),
         ],
     )
-    cli_agent = CliAgent.with_default_config(memory, execution_env, ai=mock_ai)
+    cli_agent = CliAgent.with_default_config(memory, env, ai=mock_ai)
     outfile = "output.txt"
     os.path.join(temp_dir, outfile)
     code = cli_agent.init(
@@ -39,7 +46,8 @@ def test_init_standard_config(monkeypatch):
         )
     )
 
-    env = DiskExecutionEnv()
+    # the agent already ran the code here, remove its output to check `code`
+    (env.files.working_dir / outfile).unlink(missing_ok=True)
     env.upload(code).run(f"bash {ENTRYPOINT_FILE}")
     code = env.download()
 
@@ -47,12 +55,10 @@ def test_init_standard_config(monkeypatch):
     assert code[outfile] == "Hello World!"
 
 
-def test_init_lite_config(monkeypatch):
+def test_init_lite_config(monkeypatch, workspace, env):
     monkeypatch.setattr("builtins.input", lambda _: "y")
-    temp_dir = tempfile.mkdtemp()
-    memory = DiskMemory(memory_path(temp_dir))
+    temp_dir, memory = workspace
     # version_manager = GitVersionManager(temp_dir)
-    execution_env = DiskExecutionEnv()
     mock_ai = MockAI(
         [
             AIMessage(
@@ -62,7 +68,7 @@ def test_init_lite_config(monkeypatch):
         ],
     )
     cli_agent = CliAgent.with_default_config(
-        memory, execution_env, ai=mock_ai, code_gen_fn=lite_gen
+        memory, env, ai=mock_ai, code_gen_fn=lite_gen
     )
     outfile = "output.txt"
     os.path.join(temp_dir, outfile)
@@ -72,7 +78,8 @@ def test_init_lite_config(monkeypatch):
         )
     )
 
-    env = DiskExecutionEnv()
+    # the agent already ran the code here, remove its output to check `code`
+    (env.files.working_dir / outfile).unlink(missing_ok=True)
     env.upload(code).run(f"bash {ENTRYPOINT_FILE}")
     code = env.download()
 
@@ -80,11 +87,9 @@ def test_init_lite_config(monkeypatch):
     assert code[outfile].strip() == "Hello World!"
 
 
-def test_init_clarified_gen_config(monkeypatch):
+def test_init_clarified_gen_config(monkeypatch, workspace, env):
     monkeypatch.setattr("builtins.input", lambda _: "y")
-    temp_dir = tempfile.mkdtemp()
-    memory = DiskMemory(memory_path(temp_dir))
-    execution_env = DiskExecutionEnv()
+    temp_dir, memory = workspace
     mock_ai = MockAI(
         [
             AIMessage("nothing to clarify"),
@@ -95,7 +100,7 @@ def test_init_clarified_gen_config(monkeypatch):
         ],
     )
     cli_agent = CliAgent.with_default_config(
-        memory, execution_env, ai=mock_ai, code_gen_fn=clarified_gen
+        memory, env, ai=mock_ai, code_gen_fn=clarified_gen
     )
     outfile = "output.txt"
     code = cli_agent.init(
@@ -104,7 +109,8 @@ def test_init_clarified_gen_config(monkeypatch):
         )
     )
 
-    env = DiskExecutionEnv()
+    # the agent already ran the code here, remove its output to check `code`
+    (env.files.working_dir / outfile).unlink(missing_ok=True)
     env.upload(code).run(f"bash {ENTRYPOINT_FILE}")
     code = env.download()
 
@@ -112,9 +118,9 @@ def test_init_clarified_gen_config(monkeypatch):
     assert code[outfile].strip() == "Hello World!"
 
 
-def test_improve_standard_config(monkeypatch):
+def test_improve_standard_config(monkeypatch, workspace, env):
     monkeypatch.setattr("builtins.input", lambda _: "y")
-    temp_dir = tempfile.mkdtemp()
+    temp_dir, memory = workspace
     code = FilesDict(
         {
             "main.py": "def write_hello_world_to_file(filename):\n    \"\"\"\n    Writes 'Hello World!' to the specified file.\n    \n    :param filename: The name of the file to write to.\n    \"\"\"\n    with open(filename, 'w') as file:\n        file.write('Hello World!')\n\nif __name__ == \"__main__\":\n    output_filename = 'output.txt'\n    write_hello_world_to_file(output_filename)",
@@ -122,9 +128,7 @@ def test_improve_standard_config(monkeypatch):
             "run.sh": "python3 main.py\n",
         }
     )
-    memory = DiskMemory(memory_path(temp_dir))
     # version_manager = GitVersionManager(temp_dir)
-    execution_env = DiskExecutionEnv()
     mock_ai = MockAI(
         [
             AIMessage(
@@ -132,7 +136,7 @@ def test_improve_standard_config(monkeypatch):
             )
         ]
     )
-    cli_agent = CliAgent.with_default_config(memory, execution_env, ai=mock_ai)
+    cli_agent = CliAgent.with_default_config(memory, env, ai=mock_ai)
 
     code = cli_agent.improve(
         code,
@@ -141,7 +145,6 @@ def test_improve_standard_config(monkeypatch):
         ),
     )
 
-    env = DiskExecutionEnv()
     env.upload(code).run(f"bash {ENTRYPOINT_FILE}")
     code = env.download()
 
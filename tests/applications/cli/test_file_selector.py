@@ -0,0 +1,59 @@
+import pytest
+
+from gpt_engineer.applications.cli.file_selector import FileSelector
+from gpt_engineer.core.default.paths import META_DATA_REL_PATH
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    monkeypatch.setenv("GPTE_TEST_MODE", "True")
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "b.py").write_text("b = 2\n")
+    (tmp_path / "a.py").write_text("a = 1\n")
+    (tmp_path / "c.py").write_text("c = 3\n")
+    (tmp_path / "image.bin").write_bytes(b"\xff\xfe\x00\x81")
+    return tmp_path
+
+
+def write_file_selection(project, files):
+    meta_path = project / META_DATA_REL_PATH
+    meta_path.mkdir(exist_ok=True)
+    lines = "\n".join(f'"{file}" = "selected"' for file in files)
+    (meta_path / FileSelector.FILE_LIST_NAME).write_text(f"[files]\n{lines}\n")
+
+
+def test_ask_for_files_keeps_selection_order(project):
+    write_file_selection(project, ["src/b.py", "c.py", "a.py"])
+
+    files_dict, is_linting = FileSelector(project).ask_for_files()
+
+    assert list(files_dict) == ["src/b.py", "c.py", "a.py"]
+    assert files_dict["src/b.py"] == "b = 2\n"
+    assert files_dict["c.py"] == "c = 3\n"
+    assert files_dict["a.py"] == "a = 1\n"
+    assert is_linting
+
+
+def test_ask_for_files_skips_unreadable_files(project, capsys):
+    write_file_selection(project, ["a.py", "missing.py", "image.bin", "c.py"])
+
+    files_dict, _ = FileSelector(project).ask_for_files()
+
+    assert list(files_dict) == ["a.py", "c.py"]
+    out = capsys.readouterr().out
+    assert "Warning: File not found missing.py" in out
+    assert "Warning: File not UTF-8 encoded image.bin, skipping" in out
+
+
+def test_read_selected_file(project):
+    selector = FileSelector(project)
+
+    assert selector.read_selected_file("a.py") == ("a = 1\n", None)
+    assert selector.read_selected_file("missing.py") == (
+        None,
+        "Warning: File not found missing.py",
+    )
+    assert selector.read_selected_file("image.bin") == (
+        None,
+        "Warning: File not UTF-8 encoded image.bin, skipping",
+    )
@@ -1,20 +1,25 @@
 import dataclasses
+import difflib
 import functools
 import inspect
 import os
+import random
 import shutil
+import subprocess
+import sys
 import tempfile
 
 from argparse import Namespace
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
 import pytest
-import typer
 
 import gpt_engineer.applications.cli.main as main
 
 from gpt_engineer.applications.cli.main import load_prompt
 from gpt_engineer.core.default.disk_memory import DiskMemory
+from gpt_engineer.core.default.paths import META_DATA_REL_PATH, PREPROMPTS_PATH
+from gpt_engineer.core.files_dict import FilesDict
 from gpt_engineer.core.prompt import Prompt
 
 
@@ -26,9 +31,9 @@ def dcommand(typer_f, **kwargs):
         nonlocal required
 
         t = param.annotation or "typing.Any"
-        if param.default.default is not ...:
+        if param.default is not inspect.Parameter.empty:
             required = False
-            return name, t, dataclasses.field(default=param.default.default)
+            return name, t, dataclasses.field(default=param.default)
 
         if not required:
             raise ValueError("Required value after optional")
@@ -158,7 +163,72 @@ class TestMain:
             llm_via_clipboard=True,
             no_execution=True,
         )
-        pytest.raises(typer.Exit, args)
+        pytest.raises(SystemExit, args)
+
+    #  Declined improvements still stage the originals when linting rewrites them.
+    @pytest.mark.parametrize("linting", [True, False])
+    def test_declined_improvements_staging(self, tmp_path, monkeypatch, linting):
+        p = tmp_path / "projects/example"
+        meta_p = p / META_DATA_REL_PATH
+        meta_p.mkdir(parents=True)
+        (p / "prompt").write_text(prompt_text)
+        (p / "main.py").write_text("x=1\n")
+        linting_section = "" if linting else '[linting]\n"linting" = "off"\n'
+        (meta_p / "file_selection.toml").write_text(
+            f'{linting_section}[files]\n"main.py" = "selected"\n'
+        )
+
+        class FakeAI:
+            vision = False
+            token_usage_log = Mock(is_openai_model=lambda: False)
+
+            def __init__(self, **_):
+                pass
+
+        staged = []
+        monkeypatch.setenv("GPTE_TEST_MODE", "True")
+        monkeypatch.setattr("gpt_engineer.core.ai.ClipboardAI", FakeAI)
+        monkeypatch.setattr(
+            "gpt_engineer.core.default.steps.handle_improve_mode",
+            lambda *_: FilesDict({"main.py": "x = 2\n"}),
+        )
+        monkeypatch.setattr(
+            main, "stage_uncommitted_to_git", lambda *args: staged.append(args)
+        )
+        monkeypatch.setattr("builtins.input", lambda _: "n")
+
+        DefaultArgumentsMain(str(p), improve_mode=True, llm_via_clipboard=True)()
+
+        if linting:
+            assert (p / "main.py").read_text() == "x = 1\n"
+            assert len(staged) == 1
+        else:
+            assert (p / "main.py").read_text() == "x=1\n"
+            assert staged == []
+
+    #  Rejects incompatible modes before importing the LLM stack.
+    def test_invalid_arguments_skip_llm_imports(self, tmp_path):
+        code = (
+            "import sys\n"
+            "import gpt_engineer.applications.cli.main as main\n"
+            "try:\n"
+            f"    main.app([{str(tmp_path)!r}, '--improve', '--lite'])\n"
+            "except SystemExit as e:\n"
+            "    assert e.code == 1\n"
+            "assert not {'openai', 'langchain'} & set(sys.modules)\n"
+        )
+        subprocess.run([sys.executable, "-c", code], check=True)
+
+    #  Parses command line arguments into the keyword arguments of main.
+    def test_parser_matches_main_signature(self):
+        args = main.build_parser().parse_args(
+            ["projects/example", "-i", "-t", "0.5", "--entrypoint_prompt", "ep"]
+        )
+        assert set(vars(args)) == set(inspect.signature(main.main).parameters)
+        assert args.project_path == "projects/example"
+        assert args.improve_mode is True
+        assert args.temperature == 0.5
+        assert args.entrypoint_prompt_file == "ep"
 
     #  Tests the creation of a log file in improve mode.
 
@@ -261,6 +331,158 @@ class TestLoadPrompt:
             assert "mona_lisa.jpg" in result.image_urls
 
 
+class TestGetPrepromptsPath:
+    #  Default preprompts are used when custom preprompts are not requested
+    def test_default_preprompts(self, tmp_path):
+        assert main.get_preprompts_path(False, tmp_path) == PREPROMPTS_PATH
+        assert not (tmp_path / "preprompts").exists()
+
+    #  Missing preprompts are copied, existing custom ones are kept
+    def test_custom_preprompts(self, tmp_path):
+        custom_path = tmp_path / "preprompts"
+        custom_path.mkdir()
+        (custom_path / "roadmap").write_text("custom roadmap")
+
+        assert main.get_preprompts_path(True, tmp_path) == custom_path
+        assert (custom_path / "roadmap").read_text() == "custom roadmap"
+        for file in PREPROMPTS_PATH.iterdir():
+            if file.name != "roadmap":
+                assert (custom_path / file.name).read_text() == file.read_text()
+
+
+class TestCompare:
+    #  Only files with changes are printed, with colored added and removed lines
+    def test_compare_prints_changed_files(self, capsys):
+        before = FilesDict({"main.py": "a = 1\nb = 2\n", "same.py": "pass\n"})
+        after = FilesDict(
+            {"main.py": "a = 1\nb = 3\n", "same.py": "pass\n", "new.py": "c = 4\n"}
+        )
+
+        main.compare(before, after)
+
+        out = capsys.readouterr().out
+        assert "Changes to main.py:" in out
+        assert "Changes to new.py:" in out
+        assert "same.py" not in out
+        assert f"{main.RED}-b = 2{main.RESET}" in out
+        assert f"{main.GREEN}+b = 3{main.RESET}" in out
+        assert out.index("Changes to main.py:") < out.index("Changes to new.py:")
+
+
+class TestColoredDiff:
+    before = "".join(f"{i}\n" for i in range(1, 15))
+    after = before.replace("2\n", "two\n", 1).replace("12\n", "") + "15\n"
+    expected = [
+        f"{main.RED}--- {main.RESET}",
+        f"{main.GREEN}+++ {main.RESET}",
+        "@@ -1,5 +1,5 @@",
+        " 1",
+        f"{main.RED}-2{main.RESET}",
+        f"{main.GREEN}+two{main.RESET}",
+        " 3",
+        " 4",
+        " 5",
+        "@@ -9,6 +9,6 @@",
+        " 9",
+        " 10",
+        " 11",
+        f"{main.RED}-12{main.RESET}",
+        " 13",
+        " 14",
+        f"{main.GREEN}+15{main.RESET}",
+    ]
+
+    #  The formatter used with cdifflib matches difflib.unified_diff
+    @pytest.mark.parametrize(
+        "a, b",
+        [
+            ([], []),
+            ([], ["a"]),
+            (["a"], []),
+            (["a", "b", "c"], ["a", "b", "c"]),
+            (["a"], ["b"]),
+            ([str(i) for i in range(20)], [str(i) for i in range(20) if i % 7]),
+            ([str(i) for i in range(20)], [str(i) for i in range(25)]),
+        ],
+    )
+    def test_unified_diff_matches_difflib(self, a, b):
+        result = main._unified_diff(difflib.SequenceMatcher(None, a, b), a, b)
+        assert list(result) == list(difflib.unified_diff(a, b, lineterm=""))
+
+    #  Same comparison over random inputs
+    def test_unified_diff_matches_difflib_random(self):
+        rng = random.Random(0)
+        for _ in range(300):
+            a = [rng.choice("abcde") for _ in range(rng.randint(0, 30))]
+            b = [rng.choice("abcde") for _ in range(rng.randint(0, 30))]
+            result = main._unified_diff(difflib.SequenceMatcher(None, a, b), a, b)
+            assert list(result) == list(difflib.unified_diff(a, b, lineterm=""))
+
+    #  Without cdifflib the diff comes from difflib.unified_diff
+    def test_colored_diff_without_cdifflib(self, monkeypatch):
+        monkeypatch.setattr(main, "CSequenceMatcher", None)
+        assert list(main.colored_diff(self.before, self.after)) == self.expected
+
+    #  With cdifflib the diff is formatted from its opcodes
+    def test_colored_diff_with_cdifflib(self, monkeypatch):
+        cdifflib = pytest.importorskip("cdifflib")
+        monkeypatch.setattr(main, "CSequenceMatcher", cdifflib.CSequenceMatcher)
+        assert list(main.colored_diff(self.before, self.after)) == self.expected
+
+
+class TestTermColors:
+    class FakeStdout:
+        def __init__(self, tty):
+            self.tty = tty
+
+        def isatty(self):
+            return self.tty
+
+    @pytest.mark.parametrize(
+        "env, tty, expected",
+        [
+            ({}, True, True),
+            ({}, False, False),
+            ({"TERM": "dumb"}, True, False),
+            ({"NO_COLOR": "1"}, True, False),
+            ({"ANSI_COLORS_DISABLED": "1"}, True, False),
+            ({"FORCE_COLOR": "1"}, False, True),
+            ({"NO_COLOR": "1", "FORCE_COLOR": "1"}, True, False),
+        ],
+    )
+    def test_use_term_colors(self, monkeypatch, env, tty, expected):
+        for name in ("TERM", "NO_COLOR", "ANSI_COLORS_DISABLED", "FORCE_COLOR"):
+            monkeypatch.delenv(name, raising=False)
+        for name, value in env.items():
+            monkeypatch.setenv(name, value)
+        monkeypatch.setattr(sys, "stdout", self.FakeStdout(tty))
+        assert main.use_term_colors() is expected
+
+    #  Prompts are plain when the output is piped
+    def test_prompts_uncolored_when_piped(self):
+        code = (
+            "import gpt_engineer.applications.cli.main as main\n"
+            "print(repr(main.TERM_CHOICES + main.APPLY_CHANGES_QUESTION))\n"
+        )
+        env = {k: v for k, v in os.environ.items() if k != "FORCE_COLOR"}
+        out = subprocess.run(
+            [sys.executable, "-c", code], env=env, capture_output=True, text=True
+        ).stdout
+        assert out.strip() == repr("y/n Do you want to apply these changes?")
+
+
+class TestPromptYesno:
+    #  Asks again until a valid answer is given
+    @pytest.mark.parametrize(
+        "answers, expected",
+        [(["y"], True), ([" YES "], True), (["n"], False), (["maybe", "no"], False)],
+    )
+    def test_prompt_yesno(self, monkeypatch, answers, expected):
+        responses = iter(answers)
+        monkeypatch.setattr("builtins.input", lambda _: next(responses))
+        assert main.prompt_yesno() is expected
+
+
 #     def test_log_creation_in_improve_mode(self, tmp_path, monkeypatch):
 #         def improve_generator():
 #             yield "y"
@@ -0,0 +1,30 @@
+import os
+
+from gpt_engineer.core.preprompts_holder import PrepromptsHolder
+
+
+def test_get_preprompts_reloads_changed_files(tmp_path):
+    (tmp_path / "roadmap").write_text("first roadmap")
+    holder = PrepromptsHolder(tmp_path)
+
+    assert holder.get_preprompts() == {"roadmap": "first roadmap"}
+
+    (tmp_path / "roadmap").write_text("second roadmap")
+    # make sure the modification time changes on coarse-grained file systems
+    stat = (tmp_path / "roadmap").stat()
+    os.utime(tmp_path / "roadmap", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    (tmp_path / "philosophy").write_text("philosophy")
+
+    assert holder.get_preprompts() == {
+        "philosophy": "philosophy",
+        "roadmap": "second roadmap",
+    }
+
+
+def test_get_preprompts_returns_copy(tmp_path):
+    (tmp_path / "roadmap").write_text("roadmap")
+    holder = PrepromptsHolder(tmp_path)
+
+    holder.get_preprompts()["roadmap"] = "changed"
+
+    assert holder.get_preprompts() == {"roadmap": "roadmap"}
@@ -2,13 +2,21 @@ from typing import Any, List, Optional
 
 
 class MockAI:
+    __slots__ = ("responses", "index")
+
     def __init__(self, response: List):
-        self.responses = iter(response)
+        self.responses = response
+        self.index = 0
+
+    def _next_response(self) -> List[str]:
+        response = self.responses[self.index]
+        self.index += 1
+        return [response]
 
     def start(self, system: str, user: Any, *, step_name: str) -> List[str]:
-        return [next(self.responses)]
+        return self._next_response()
 
     def next(
         self, messages: List[str], prompt: Optional[str] = None, *, step_name: str
     ) -> List[str]:
-        return [next(self.responses)]
+        return self._next_response()